@@ -7,6 +7,7 @@
 import logging
 import re
 from configparser import NoSectionError, NoOptionError
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic import BaseModel, ValidationError
@@ -82,7 +83,9 @@ class Config(BaseConfig):
             raise InvalidConfigError(error_msg) from error
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def _normalize_name(name: str, delimiter: str = "") -> str:
+        # Cached, since the repository name is normalized again for each of its test suites
         normalized = re.sub(r"[^a-zA-Z0-9_]+", delimiter, name).lower()
         return normalized.strip("_")
 
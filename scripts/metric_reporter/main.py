@@ -7,7 +7,6 @@
 import argparse
 import logging
 
-from google.cloud import bigquery
 from google.oauth2 import service_account
 
 from scripts.metric_reporter.config import Config, InvalidConfigError
@@ -19,7 +18,7 @@ from scripts.metric_reporter.parser.coverage_json_parser import (
 )
 from scripts.metric_reporter.parser.junit_xml_parser import JUnitXmlJobTestSuites, JUnitXmlParser
 from scripts.metric_reporter.reporter.averages_reporter import AveragesReporter
-from scripts.metric_reporter.reporter.base_reporter import ReporterError
+from scripts.metric_reporter.reporter.base_reporter import BaseReporter, ReporterError
 from scripts.metric_reporter.reporter.coverage_reporter import CoverageReporter
 from scripts.metric_reporter.reporter.suite_reporter import SuiteReporter
 
@@ -63,8 +62,10 @@ def main(
         credentials = service_account.Credentials.from_service_account_file(
             bigquery_service_account_file
         )  # type: ignore
-        bigquery_client = bigquery.Client(credentials=credentials, project=gcp_project_id)
+        bigquery_client = BaseReporter.get_client(credentials, gcp_project_id)
 
+        table_reporters: list[BaseReporter] = []
+        coverage_reporters: list[CoverageReporter] = []
         for args in config.metric_reporter_args:
             logger.info(f"Reporting for {args.repository} {args.workflow} {args.test_suite}")
 
@@ -83,14 +84,34 @@ def main(
             averages_reporter = AveragesReporter(
                 args.repository, args.workflow, args.test_suite, suite_reporter.results
             )
-            coverage_reporter = CoverageReporter(
-                args.repository, args.workflow, args.test_suite, coverage_artifact_list
+            coverage_reporters.append(
+                CoverageReporter(
+                    args.repository, args.workflow, args.test_suite, coverage_artifact_list
+                )
             )
-
-            # Update BigQuery dataset tables if opted-in
-            averages_reporter.update_table(bigquery_client, gcp_project_id, bigquery_dataset_name)
-            coverage_reporter.update_table(bigquery_client, gcp_project_id, bigquery_dataset_name)
-            suite_reporter.update_table(bigquery_client, gcp_project_id, bigquery_dataset_name)
+            table_reporters.extend([averages_reporter, suite_reporter])
+
+        # Update BigQuery dataset tables if opted-in, overlapping the round trips of each reporter.
+        # Coverage results are inserted together, one batch per repository table, even if a table
+        # update failed, in which case the failure is raised once coverage has been written.
+        update_error: ReporterError | None = None
+        try:
+            BaseReporter.update_tables_parallel(
+                table_reporters, bigquery_client, gcp_project_id, bigquery_dataset_name
+            )
+        except ReporterError as error:
+            update_error = error
+        try:
+            CoverageReporter.flush_all(
+                coverage_reporters, bigquery_client, gcp_project_id, bigquery_dataset_name
+            )
+        except ReporterError as error:
+            # The coverage error is raised, so the table update error is logged to not lose it
+            if update_error is not None:
+                logger.error(f"Test Suite Reporter error: {update_error}")
+            raise error from update_error
+        if update_error is not None:
+            raise update_error
 
         logger.info("Reporting complete")
     except InvalidConfigError as error:
@@ -13,6 +13,15 @@ from pydantic import BaseModel, ValidationError
 
 from scripts.metric_reporter.parser.base_parser import ParserError, JOB_DIRECTORY_PATTERN
 
+# Renames of JUnit XML element and attribute keys to the field names of the parser models
+KEY_MAPPING: dict[str, str] = {
+    "testsuite": "test_suites",
+    "testcase": "test_cases",
+    "system-out": "system_out",  # Playwright
+    "disabled": "skipped",  # Nextest skipped == disabled
+    "#text": "text",
+}
+
 
 class JestJUnitXmlTestCase(BaseModel):
     """Represents a test case in a test suite."""
@@ -275,24 +284,17 @@ class JUnitXmlParser:
 
     def _get_test_suites(self, job_path: Path) -> list[JUnitXmlTestSuites]:
         def postprocessor(path, key, value):
-            key_mapping = {
-                "testsuite": "test_suites",
-                "testcase": "test_cases",
-                "system-out": "system_out",  # Playwright
-                "disabled": "skipped",  # Nextest skipped == disabled
-                "#text": "text",
-            }
-            key = key_mapping.get(key, key)
-            return key, value
+            return KEY_MAPPING.get(key, key), value
 
         test_suites = []
         artifact_file_paths: list[Path] = sorted(job_path.glob("*.xml"))
         for artifact_file_path in artifact_file_paths:
             self.logger.info(f"Parsing {artifact_file_path}")
-            with artifact_file_path.open() as xml_file:
-                content: str = xml_file.read()
+            # The file is passed to the XML parser as is, so that it is read incrementally rather
+            # than first loaded into a string
+            with artifact_file_path.open("rb") as xml_file:
                 test_suites_dict: dict[str, Any] = xmltodict.parse(
-                    content,
+                    xml_file,
                     attr_prefix="",
                     postprocessor=postprocessor,
                     force_list=["test_suites", "test_cases", "property"],
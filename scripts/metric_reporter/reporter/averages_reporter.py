@@ -11,6 +11,7 @@ from typing import Any, Sequence
 
 from google.api_core.exceptions import GoogleAPIError
 from google.cloud.bigquery import Client, QueryJobConfig, ScalarQueryParameter
+from pydantic import BaseModel
 
 from scripts.metric_reporter.constants import DATE_FORMAT
 from scripts.metric_reporter.reporter.base_reporter import (
@@ -26,7 +27,7 @@ DAYS_60: int = 60
 DAYS_90: int = 90
 
 
-class AveragesReporterResult(ReporterResultBase):
+class AveragesReporterResult(BaseModel, ReporterResultBase):
     """Represents the average results of test suite runs for a repository."""
 
     repository: str
@@ -85,6 +86,9 @@ class AveragesReporterResult(ReporterResultBase):
 class AveragesReporter(BaseReporter):
     """Handles the reporting of test suite results from JUnit XML Reports."""
 
+    # Last update end dates, see BaseReporter._get_last_update
+    _last_update_cache: dict[str, dict[tuple[str, str], date]] = {}
+
     def __init__(
         self,
         repository: str,
@@ -145,7 +149,19 @@ class AveragesReporter(BaseReporter):
             )
             return
 
-        self._insert_rows(client, table_id, new_results)
+        inserted: bool = self._insert_rows(client, table_id, new_results)
+
+        # Averages are in chronological order, so the newest end date is that of the last one
+        if inserted:
+            newest: AveragesReporterResult = new_results[-1]
+            self._advance_last_update(
+                table_id,
+                max(
+                    datetime.strptime(newest.stop_date_30, DATE_FORMAT).date(),
+                    datetime.strptime(newest.stop_date_60, DATE_FORMAT).date(),
+                    datetime.strptime(newest.stop_date_90, DATE_FORMAT).date(),
+                ),
+            )
 
     def _check_rows_exist(
         self, client: Client, table_id: str, results: Sequence[AveragesReporterResult]
@@ -186,47 +202,37 @@ class AveragesReporter(BaseReporter):
             query_job = client.query(query, job_config=job_config)
             return any(query_job.result())
         except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+            self._raise_reporter_error(
+                error, self._QUERY_ERROR_TEMPLATES, query=query, table_id=table_id
+            )
 
-    def _get_last_update(self, client: Client, table_id: str) -> date | None:
+    def _query_last_updates(self, client: Client, table_id: str) -> dict[tuple[str, str], date]:
         query = f"""
-            SELECT GREATEST(MAX(`End Date 30`), MAX(`End Date 60`), MAX(`End Date 90`)) as last_update 
+            SELECT
+                Workflow AS workflow,
+                `Test Suite` AS test_suite,
+                GREATEST(MAX(`End Date 30`), MAX(`End Date 60`), MAX(`End Date 90`)) AS last_update
             FROM `{table_id}`
-            WHERE Repository = @repository AND Workflow = @workflow AND `Test Suite` = @test_suite
+            WHERE Repository = @repository
+            GROUP BY workflow, test_suite
         """  # nosec
-        query_parameters = [
-            ScalarQueryParameter("repository", "STRING", self.repository),
-            ScalarQueryParameter("workflow", "STRING", self.workflow),
-            ScalarQueryParameter("test_suite", "STRING", self.test_suite),
-        ]
+        query_parameters = [ScalarQueryParameter("repository", "STRING", self.repository)]
         job_config = QueryJobConfig(query_parameters=query_parameters)
         try:
             query_job = client.query(query, job_config=job_config)
-            result = query_job.result()
-            for row in result:
-                last_update: date | None = row["last_update"]
-                return last_update
-        except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
+            return {
+                (row["workflow"], row["test_suite"]): row["last_update"]
+                for row in query_job.result()
+                if row["last_update"]
             }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
-        return None
+        except (GoogleAPIError, TypeError, ValueError) as error:
+            self._raise_reporter_error(
+                error, self._QUERY_ERROR_TEMPLATES, query=query, table_id=table_id
+            )
 
     def _insert_rows(
         self, client: Client, table_id: str, results: list[AveragesReporterResult]
-    ) -> None:
+    ) -> bool:
         results_exist: bool = self._check_rows_exist(client, table_id, results)
         if results_exist:
             self.logger.warning(
@@ -234,12 +240,10 @@ class AveragesReporter(BaseReporter):
                 f"{self.repository}/{self.workflow}/{self.test_suite} already exist in table "
                 f"{table_id}. Aborting insert."
             )
-            return
+            return False
 
         try:
-            json_rows: list[dict[str, Any]] = [
-                results.dict_with_fieldnames() for results in results
-            ]
+            json_rows: list[dict[str, Any]] = [result.dict_with_fieldnames() for result in results]
             errors = client.insert_rows_json(table_id, json_rows)
             if errors:
                 client_error_msg: str = (
@@ -252,14 +256,9 @@ class AveragesReporter(BaseReporter):
                 f"Inserted {len(results)} averages from "
                 f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}."
             )
+            return True
         except (TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                TypeError: f"data is an improper format for insertion in {table_id}",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+            self._raise_reporter_error(error, self._INSERT_ERROR_TEMPLATES, table_id=table_id)
 
     def _parse_results(
         self,
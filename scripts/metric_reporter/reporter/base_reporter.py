@@ -4,18 +4,32 @@
 
 """Module defining the base for all reporting in the Metric Reporter."""
 
+import io
 import logging
-from typing import Any, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, NoReturn, Sequence
 
 from dateutil import parser
-from google.cloud.bigquery import Client
-from pydantic import BaseModel
+from google.api_core.exceptions import GoogleAPIError
+from google.auth.credentials import Credentials, with_scopes_if_required
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud.bigquery import Client, LoadJobConfig, SourceFormat, WriteDisposition
+from pydantic_core import to_json
+from requests.adapters import HTTPAdapter
 
 from scripts.metric_reporter.constants import DATE_FORMAT
 
 
-class ReporterResultBase(BaseModel):
-    """Base class for reporter results."""
+class ReporterResultBase:
+    """Base class for reporter results.
+
+    Results are either pydantic models or slotted dataclasses, so the base defines no instance
+    attributes of its own.
+    """
+
+    __slots__ = ()
 
     def dict_with_fieldnames(self) -> dict[str, Any]:
         """Convert the result to a dictionary with field names.
@@ -32,19 +46,233 @@ class ReporterError(Exception):
     pass
 
 
+def parse_timestamp(timestamp: str) -> datetime:
+    """Parse a timestamp into a timezone-aware datetime.
+
+    ISO 8601 timestamps are parsed with fromisoformat, falling back to the much slower, but more
+    lenient, dateutil parser for other formats. Timestamps without an offset are UTC, so that they
+    compare with the timezone-aware TIMESTAMP values read from BigQuery.
+
+    Args:
+        timestamp (str): The timestamp to parse.
+
+    Returns:
+        datetime: The parsed timestamp.
+
+    Raises:
+        ReporterError: If the timestamp has an invalid format.
+    """
+    try:
+        parsed_datetime = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        try:
+            parsed_datetime = parser.parse(timestamp)
+        except (TypeError, ValueError) as error:
+            raise ReporterError(f"Invalid timestamp format: {timestamp}") from error
+    if parsed_datetime.tzinfo is None:
+        return parsed_datetime.replace(tzinfo=timezone.utc)
+    return parsed_datetime
+
+
 class BaseReporter:
     """Base class for reporters."""
 
     logger = logging.getLogger(__name__)
+    repository: str
+    workflow: str
+    test_suite: str
     results: Sequence[ReporterResultBase] = []
 
+    # Last updates by (workflow, test suite), cached per table so that reporters sharing a table
+    # retrieve them with a single query. Reporters using the cache define their own dict, since the
+    # last updates of each table type differ.
+    _last_update_cache: dict[str, dict[tuple[str, str], Any]]
+
+    # Maximum number of rows sent to BigQuery in a single streaming insert request
+    _BATCH_SIZE: int = 500
+
+    # Minimum number of rows for which a batch load job is used instead of streaming inserts
+    _LOAD_JOB_THRESHOLD: int = 1000
+
+    # Number of HTTP connections pooled by each BigQuery client shared between reporters
+    _CLIENT_POOL_SIZE: int = 32
+    _clients: dict[str, Client] = {}
+
+    # Maximum number of reporters updating their tables concurrently
+    _MAX_WORKERS: int = 8
+
+    # Error message templates by error type, formatted with the query and table ID of the failed
+    # BigQuery call, see _raise_reporter_error
+    _QUERY_ERROR_TEMPLATES: tuple[tuple[type[Exception], str], ...] = (
+        (GoogleAPIError, "Error executing query: {query}"),
+        (TypeError, "The query, {query}, has an invalid format or type"),
+        (ValueError, "The table name {table_id} is invalid"),
+    )
+    _INSERT_ERROR_TEMPLATES: tuple[tuple[type[Exception], str], ...] = (
+        (TypeError, "data is an improper format for insertion in {table_id}"),
+        (ValueError, "The table name {table_id} is invalid"),
+    )
+    _LOAD_ERROR_TEMPLATES: tuple[tuple[type[Exception], str], ...] = (
+        (GoogleAPIError, "Failed to load rows from {source} into {table_id}"),
+        (TypeError, "data is an improper format for loading into {table_id}"),
+        (ValueError, "The table name {table_id} is invalid"),
+    )
+
+    @classmethod
+    def get_client(cls, credentials: Credentials, project_id: str) -> Client:
+        """Get the BigQuery client of a project shared by all reporters.
+
+        The client is created on the first call for the project with a pooled HTTP session, so
+        that every reporter reuses the same connections to BigQuery. Later calls for the project
+        return that client, so the credentials only take effect on the first call.
+
+        Args:
+            credentials (Credentials): The credentials used to authenticate with BigQuery.
+            project_id (str): The BigQuery project ID.
+
+        Returns:
+            Client: The shared BigQuery client of the project.
+        """
+        client = BaseReporter._clients.get(project_id)
+        if client is None:
+            # The client only scopes the credentials of the session it creates itself, so those of
+            # the pooled session are scoped here
+            scoped_credentials: Credentials = with_scopes_if_required(  # type: ignore
+                credentials, Client.SCOPE
+            )
+            session = AuthorizedSession(scoped_credentials)  # type: ignore
+            adapter = HTTPAdapter(
+                pool_connections=cls._CLIENT_POOL_SIZE, pool_maxsize=cls._CLIENT_POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            client = Client(project=project_id, credentials=scoped_credentials, _http=session)
+            BaseReporter._clients[project_id] = client
+        return client
+
+    @classmethod
+    def update_tables_parallel(
+        cls,
+        reporters: Sequence["BaseReporter"],
+        client: Client,
+        project_id: str,
+        dataset_name: str,
+        max_workers: int | None = None,
+    ) -> None:
+        """Update the BigQuery tables of several reporters concurrently.
+
+        Table updates are bound by BigQuery round trips, so they are run on a thread pool sharing
+        the thread-safe client. Every update is attempted before failures are reported.
+
+        Args:
+            reporters (Sequence[BaseReporter]): The reporters to update the tables of.
+            client (Client): The client to interact with BigQuery.
+            project_id (str): The BigQuery project ID.
+            dataset_name (str): The BigQuery dataset name.
+            max_workers (int | None): Maximum number of concurrent updates. Defaults to
+                                      _MAX_WORKERS.
+
+        Raises:
+            ReporterError: If one or more of the reporters failed to update their table.
+        """
+        errors: list[ReporterError] = []
+        with ThreadPoolExecutor(max_workers=max_workers or cls._MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(reporter.update_table, client, project_id, dataset_name)
+                for reporter in reporters
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except ReporterError as error:
+                    errors.append(error)
+        if errors:
+            error_msg: str = (
+                f"{len(errors)} of {len(reporters)} table updates failed: "
+                f"{'; '.join(str(error) for error in errors)}"
+            )
+            raise ReporterError(error_msg) from errors[0]
+
     @staticmethod
-    def _extract_date(timestamp: str) -> str:
+    def _ndjson_lines(results: Iterable[ReporterResultBase]) -> Iterator[bytes]:
+        # Serialize one row at a time so a load job payload never holds every row as a dict
+        for result in results:
+            yield to_json(result.dict_with_fieldnames()) + b"\n"
+
+    @classmethod
+    def _load_rows(
+        cls,
+        client: Client,
+        table_id: str,
+        results: Sequence[ReporterResultBase],
+        source: str,
+    ) -> None:
+        job_config = LoadJobConfig(
+            source_format=SourceFormat.NEWLINE_DELIMITED_JSON,
+            write_disposition=WriteDisposition.WRITE_APPEND,
+        )
         try:
-            datetime = parser.parse(timestamp)
-            return datetime.strftime(DATE_FORMAT)
-        except (ValueError, TypeError) as error:
-            raise ReporterError(f"Invalid timestamp format: {timestamp}") from error
+            ndjson = io.BytesIO()
+            ndjson.writelines(cls._ndjson_lines(results))
+            ndjson.seek(0)
+            load_job = client.load_table_from_file(ndjson, table_id, job_config=job_config)
+            load_job.result()
+            cls.logger.info(
+                f"Loaded {len(results)} results from {source} into {table_id} with job "
+                f"{load_job.job_id}."
+            )
+        except (GoogleAPIError, TypeError, ValueError) as error:
+            cls._raise_reporter_error(
+                error, cls._LOAD_ERROR_TEMPLATES, source=source, table_id=table_id
+            )
+
+    @classmethod
+    def _raise_reporter_error(
+        cls, error: Exception, templates: tuple[tuple[type[Exception], str], ...], **context: str
+    ) -> NoReturn:
+        # Templates are scanned in order, so the first one matching the error type is used
+        error_msg = next(
+            template.format(**context)
+            for error_type, template in templates
+            if isinstance(error, error_type)
+        )
+        cls.logger.error(error_msg, exc_info=error)
+        raise ReporterError(error_msg) from error
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_date(timestamp: str) -> str:
+        # Cached since parallel jobs of a workflow commonly report the same timestamp
+        return parse_timestamp(timestamp).strftime(DATE_FORMAT)
+
+    def _get_last_update(self, client: Client, table_id: str) -> Any:
+        # Read once, since reporters updating in parallel may replace the entry at any time
+        last_updates = self._last_update_cache.get(table_id)
+        if last_updates is None:
+            last_updates = self._query_last_updates(client, table_id)
+            self._last_update_cache[table_id] = last_updates
+        return last_updates.get((self.workflow, self.test_suite))
+
+    def _advance_last_update(self, table_id: str, last_update: Any) -> None:
+        # Inserted results are the newest of the test suite, so the cached last update is advanced
+        # to them rather than invalidated
+        last_updates = self._last_update_cache.get(table_id)
+        if last_updates is not None:
+            last_updates[(self.workflow, self.test_suite)] = last_update
+
+    def _query_last_updates(self, client: Client, table_id: str) -> dict[tuple[str, str], Any]:
+        """Query the last updates of every workflow and test suite of the repository in a table.
+
+        Args:
+            client (Client): The client to interact with BigQuery.
+            table_id (str): The BigQuery table ID.
+
+        Returns:
+            dict[tuple[str, str], Any]: The last updates by workflow and test suite.
+
+        Raises:
+            NotImplementedError: If the method is not implemented by a subclass using the cache.
+        """
+        raise NotImplementedError("Subclasses must implement the `_query_last_updates` method.")
 
     def update_table(self, client: Client, project_id: str, dataset_name: str) -> None:
         """Update the BigQuery table.
@@ -8,11 +8,17 @@ from datetime import datetime
 from typing import Any, Sequence
 
 from google.api_core.exceptions import GoogleAPIError
-from google.cloud.bigquery import ArrayQueryParameter, Client, QueryJobConfig, ScalarQueryParameter
+from google.cloud.bigquery import (
+    ArrayQueryParameter,
+    Client,
+    QueryJobConfig,
+    ScalarQueryParameter,
+)
+from pydantic import BaseModel, Field, TypeAdapter
 
-from scripts.metric_reporter.constants import DATETIME_FORMAT
 from scripts.metric_reporter.parser.coverage_json_parser import (
     LlvmCovReport,
+    LlvmCovStats,
     LlvmCovTotals,
     PytestReport,
     PytestTotals,
@@ -21,35 +27,43 @@ from scripts.metric_reporter.reporter.base_reporter import (
     BaseReporter,
     ReporterResultBase,
     ReporterError,
+    parse_timestamp,
 )
 
+# Number of days of partitions searched for the last update before searching older partitions
+LAST_UPDATE_LOOKBACK_DAYS: int = 30
+
 
-class CoverageReporterResult(ReporterResultBase):
+class CoverageReporterResult(BaseModel, ReporterResultBase):
     """Represents the coverage of a test suite run."""
 
-    repository: str
-    workflow: str
-    test_suite: str
+    repository: str = Field(serialization_alias="Repository")
+    workflow: str = Field(serialization_alias="Workflow")
+    test_suite: str = Field(serialization_alias="Test Suite")
 
     # llvm-cov doesn't have a timestamp as part of their report, so timestamp and date may not be
     # available if CircleCI can't be used to fill in the gap
-    date: str | None = None
-    timestamp: str | None = None
-
-    job: int
-    line_count: int | None
-    line_covered: int | None
-    line_not_covered: int | None
-    line_excluded: int | None = None  # pytest only
-    line_percent: float | None
-    function_count: int | None = None  # llvm-cov only
-    function_covered: int | None = None  # llvm-cov only
-    function_not_covered: int | None = None  # llvm-cov only
-    function_percent: float | None = None  # llvm-cov only
-    branch_count: int | None
-    branch_covered: int | None
-    branch_not_covered: int | None
-    branch_percent: float | None
+    date: str | None = Field(default=None, serialization_alias="Date")
+    timestamp: str | None = Field(default=None, serialization_alias="Timestamp")
+
+    job: int = Field(serialization_alias="Job Number")
+    line_count: int | None = Field(serialization_alias="Line Count")
+    line_covered: int | None = Field(serialization_alias="Line Covered")
+    line_not_covered: int | None = Field(serialization_alias="Line Not Covered")
+    # pytest only
+    line_excluded: int | None = Field(default=None, serialization_alias="Line Excluded")
+    line_percent: float | None = Field(serialization_alias="Line Percent")
+    # llvm-cov only
+    function_count: int | None = Field(default=None, serialization_alias="Function Count")
+    function_covered: int | None = Field(default=None, serialization_alias="Function Covered")
+    function_not_covered: int | None = Field(
+        default=None, serialization_alias="Function Not Covered"
+    )
+    function_percent: float | None = Field(default=None, serialization_alias="Function Percent")
+    branch_count: int | None = Field(serialization_alias="Branch Count")
+    branch_covered: int | None = Field(serialization_alias="Branch Covered")
+    branch_not_covered: int | None = Field(serialization_alias="Branch Not Covered")
+    branch_percent: float | None = Field(serialization_alias="Branch Percent")
 
     def dict_with_fieldnames(self) -> dict[str, Any]:
         """Convert the coverage result to a dictionary with field names.
@@ -57,27 +71,13 @@ class CoverageReporterResult(ReporterResultBase):
         Returns:
             dict[str, Any]: Dictionary representation of the coverage result.
         """
-        return {
-            "Repository": self.repository,
-            "Workflow": self.workflow,
-            "Test Suite": self.test_suite,
-            "Date": self.date,
-            "Timestamp": self.timestamp,
-            "Job Number": self.job,
-            "Line Count": self.line_count,
-            "Line Covered": self.line_covered,
-            "Line Not Covered": self.line_not_covered,
-            "Line Excluded": self.line_excluded,
-            "Line Percent": self.line_percent,
-            "Function Count": self.function_count,
-            "Function Covered": self.function_covered,
-            "Function Not Covered": self.function_not_covered,
-            "Function Percent": self.function_percent,
-            "Branch Count": self.branch_count,
-            "Branch Covered": self.branch_covered,
-            "Branch Not Covered": self.branch_not_covered,
-            "Branch Percent": self.branch_percent,
-        }
+        return self.model_dump(by_alias=True)
+
+
+# Serializes a list of results to BigQuery rows in a single call to pydantic-core
+_RESULTS_ADAPTER: TypeAdapter[list[CoverageReporterResult]] = TypeAdapter(
+    list[CoverageReporterResult]
+)
 
 
 class CoverageReporter(BaseReporter):
@@ -106,6 +106,13 @@ class CoverageReporter(BaseReporter):
         self.results: Sequence[CoverageReporterResult] = self._parse_results(
             coverage_artifact_list
         )
+        self._has_results: bool = bool(self.results)
+        # Parameters identifying the test suite, shared by every last update query
+        self._suite_query_parameters: list[ScalarQueryParameter] = [
+            ScalarQueryParameter("repository", "STRING", self.repository),
+            ScalarQueryParameter("workflow", "STRING", self.workflow),
+            ScalarQueryParameter("test_suite", "STRING", self.test_suite),
+        ]
 
     def update_table(self, client: Client, project_id: str, dataset_name: str) -> None:
         """Update the BigQuery table with new results.
@@ -115,15 +122,67 @@ class CoverageReporter(BaseReporter):
             project_id (str): The BigQuery project ID.
             dataset_name (str): The BigQuery dataset name.
         """
-        table_id = f"{project_id}.{dataset_name}.{self.repository}_coverage"
-
-        if not self.results:
+        if not self._has_results:
             self.logger.warning(
                 f"There are no results for {self.repository}/{self.workflow}/{self.test_suite} to "
-                f"add to {table_id}."
+                f"add to BigQuery."
             )
             return
 
+        table_id: str = self._get_table_id(project_id, dataset_name)
+        new_results: Sequence[CoverageReporterResult] = self._get_new_results(client, table_id)
+        if not new_results:
+            return
+
+        self._insert_rows(
+            client, table_id, new_results, f"{self.repository}/{self.workflow}/{self.test_suite}"
+        )
+
+    @classmethod
+    def flush_all(
+        cls,
+        reporters: Sequence["CoverageReporter"],
+        client: Client,
+        project_id: str,
+        dataset_name: str,
+    ) -> None:
+        """Update the BigQuery tables with new results from multiple reporters.
+
+        New results from reporters that share a repository are inserted into the repository table
+        together, rather than one round-trip per test suite. Duplicates are checked for per test
+        suite, so that a test suite with existing rows doesn't abort the insert of the others.
+
+        Args:
+            reporters (Sequence[CoverageReporter]): The reporters with results to insert.
+            client (Client): The BigQuery client to interact with BigQuery.
+            project_id (str): The BigQuery project ID.
+            dataset_name (str): The BigQuery dataset name.
+        """
+        reporters_by_table: dict[str, list[CoverageReporter]] = {}
+        for reporter in reporters:
+            if not reporter._has_results:
+                cls.logger.warning(
+                    f"There are no results for "
+                    f"{reporter.repository}/{reporter.workflow}/{reporter.test_suite} to add to "
+                    f"BigQuery."
+                )
+                continue
+            table_id: str = reporter._get_table_id(project_id, dataset_name)
+            reporters_by_table.setdefault(table_id, []).append(reporter)
+
+        for table_id, table_reporters in reporters_by_table.items():
+            new_results: list[CoverageReporterResult] = []
+            for reporter in table_reporters:
+                new_results.extend(reporter._get_new_results(client, table_id))
+            if not new_results:
+                continue
+
+            cls._insert_rows(client, table_id, new_results, table_reporters[0].repository)
+
+    def _get_table_id(self, project_id: str, dataset_name: str) -> str:
+        return f"{project_id}.{dataset_name}.{self.repository}_coverage"
+
+    def _get_new_results(self, client: Client, table_id: str) -> Sequence[CoverageReporterResult]:
         last_update: datetime | None = self._get_last_update(client, table_id)
 
         # If no 'last_update' insert all results, else insert results that occur after the last
@@ -134,7 +193,7 @@ class CoverageReporter(BaseReporter):
             else [
                 r
                 for r in self.results
-                if r.timestamp and datetime.strptime(r.timestamp, DATETIME_FORMAT) > last_update
+                if r.timestamp and parse_timestamp(r.timestamp) > last_update
             ]
         )
         if not new_results:
@@ -142,12 +201,24 @@ class CoverageReporter(BaseReporter):
                 f"There are no new results for {self.repository}/{self.workflow}/{self.test_suite} "
                 f"to add to {table_id}."
             )
-            return
+            return new_results
 
-        self._insert_rows(client, table_id, new_results)
+        # Results after a last update are newer than every row of the test suite, so the
+        # 'last_update' filter together with monotonic job timestamps is what keeps inserts
+        # idempotent. Existing rows are only checked for on the initial load of a test suite,
+        # when there is no last update to filter by, such as rows without a timestamp.
+        if last_update is None and self._check_rows_exist(client, table_id, new_results):
+            self.logger.warning(
+                f"Detected one or more results from "
+                f"{self.repository}/{self.workflow}/{self.test_suite} already exist in table "
+                f"{table_id}. Skipping their insert."
+            )
+            return []
+        return new_results
 
+    @classmethod
     def _check_rows_exist(
-        self, client: Client, table_id: str, results: Sequence[CoverageReporterResult]
+        cls, client: Client, table_id: str, results: Sequence[CoverageReporterResult]
     ) -> bool:
         query = f"""
             SELECT 1
@@ -155,87 +226,87 @@ class CoverageReporter(BaseReporter):
             WHERE `Job Number` IN UNNEST(@job_numbers)
             LIMIT 1
         """  # nosec
-        jobs: list[int] = [result.job for result in results]
+        # Duplicate job numbers are dropped to keep the query parameter small
+        jobs: list[int] = sorted({result.job for result in results})
         query_parameters = [ArrayQueryParameter("job_numbers", "INT64", jobs)]
         job_config = QueryJobConfig(query_parameters=query_parameters)
         try:
             query_job = client.query(query, job_config=job_config)
             return any(query_job.result())
         except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+            cls._raise_reporter_error(
+                error, cls._QUERY_ERROR_TEMPLATES, query=query, table_id=table_id
+            )
 
     def _get_last_update(self, client: Client, table_id: str) -> datetime | None:
+        # The coverage table is partitioned by the date of 'Timestamp', so the recent partitions
+        # are checked first. Finding no recent results does not prove a suite is absent, since
+        # older partitions were not read, so the remaining partitions are then checked. Only new
+        # or idle suites pay for that second query, and it skips the recent partitions, so that
+        # no partition is read twice. Last updates are therefore queried per test suite rather
+        # than cached per table.
+        last_update: datetime | None = self._query_last_update(client, table_id, recent=True)
+        if last_update is None:
+            last_update = self._query_last_update(client, table_id, recent=False)
+        return last_update
+
+    def _query_last_update(self, client: Client, table_id: str, recent: bool) -> datetime | None:
+        # The filters are complementary, so that together the two queries read every partition
+        partition_operator: str = ">=" if recent else "<"
         query = f"""
-            SELECT FORMAT_TIMESTAMP('{DATETIME_FORMAT}', MAX(`Timestamp`)) as last_update
+            SELECT MAX(`Timestamp`) as last_update
             FROM `{table_id}`
             WHERE Repository = @repository AND Workflow = @workflow AND `Test Suite` = @test_suite
+            AND DATE(`Timestamp`) {partition_operator}
+                DATE_SUB(CURRENT_DATE(), INTERVAL @lookback_days DAY)
         """  # nosec
-        query_parameters = [
-            ScalarQueryParameter("repository", "STRING", self.repository),
-            ScalarQueryParameter("workflow", "STRING", self.workflow),
-            ScalarQueryParameter("test_suite", "STRING", self.test_suite),
+        query_parameters: list[ScalarQueryParameter] = [
+            *self._suite_query_parameters,
+            ScalarQueryParameter("lookback_days", "INT64", LAST_UPDATE_LOOKBACK_DAYS),
         ]
         job_config = QueryJobConfig(query_parameters=query_parameters)
         try:
             query_job = client.query(query, job_config=job_config)
-            result = query_job.result()
-            for row in result:
-                last_update: str | None = row["last_update"]
-                return datetime.strptime(last_update, DATETIME_FORMAT) if last_update else None
+            # MAX is an aggregate, so there is a single row, holding a datetime or NULL
+            row = next(iter(query_job.result()), None)
+            last_update: datetime | None = row["last_update"] if row else None
+            return last_update
         except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
-        return None
+            self._raise_reporter_error(
+                error, self._QUERY_ERROR_TEMPLATES, query=query, table_id=table_id
+            )
 
+    @classmethod
     def _insert_rows(
-        self, client: Client, table_id: str, results: Sequence[CoverageReporterResult]
+        cls,
+        client: Client,
+        table_id: str,
+        results: Sequence[CoverageReporterResult],
+        source: str,
     ) -> None:
-        results_exist: bool = self._check_rows_exist(client, table_id, results)
-        if results_exist:
-            self.logger.warning(
-                f"Detected one or more results from "
-                f"{self.repository}/{self.workflow}/{self.test_suite} already exist in table "
-                f"{table_id}. Aborting insert."
-            )
+        if len(results) >= cls._LOAD_JOB_THRESHOLD:
+            cls._load_rows(client, table_id, results, source)
             return
 
         try:
-            json_rows: list[dict[str, Any]] = [
-                results.dict_with_fieldnames() for results in results
-            ]
-            errors = client.insert_rows_json(table_id, json_rows)
-            if errors:
-                client_error_msg: str = (
-                    f"Failed to insert rows from "
-                    f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}: {errors}"
+            inserted: int = 0
+            for start in range(0, len(results), cls._BATCH_SIZE):
+                chunk: Sequence[CoverageReporterResult] = results[start : start + cls._BATCH_SIZE]
+                json_rows: list[dict[str, Any]] = _RESULTS_ADAPTER.dump_python(
+                    list(chunk), by_alias=True
                 )
-                self.logger.error(client_error_msg)
-                raise ReporterError(client_error_msg)
-            self.logger.info(
-                f"Inserted {len(results)} results from "
-                f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}."
-            )
+                errors = client.insert_rows_json(table_id, json_rows)
+                if errors:
+                    client_error_msg: str = (
+                        f"Failed to insert rows from {source} into {table_id} after inserting "
+                        f"{inserted} of {len(results)} results: {errors}"
+                    )
+                    cls.logger.error(client_error_msg)
+                    raise ReporterError(client_error_msg)
+                inserted += len(chunk)
+            cls.logger.info(f"Inserted {inserted} results from {source} into {table_id}.")
         except (TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                TypeError: f"data is an improper format for insertion in {table_id}",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+            cls._raise_reporter_error(error, cls._INSERT_ERROR_TEMPLATES, table_id=table_id)
 
     def _parse_results(
         self,
@@ -244,6 +315,8 @@ class CoverageReporter(BaseReporter):
         if coverage_artifact_list is None:
             return []
 
+        # The coverage values have already been validated by the parser models, so results are
+        # built with 'model_construct' to avoid validating every field a second time.
         results: list[CoverageReporterResult] = []
         for artifact in coverage_artifact_list:
             if isinstance(artifact, LlvmCovReport):
@@ -261,7 +334,10 @@ class CoverageReporter(BaseReporter):
                 f"has an unexpected number of items in 'data'."
             )
         totals: LlvmCovTotals = llvm_cov_report.data[0].totals
-        return CoverageReporterResult(
+        lines: LlvmCovStats = totals.lines
+        functions: LlvmCovStats = totals.functions
+        branches: LlvmCovStats = totals.branches
+        return CoverageReporterResult.model_construct(
             repository=self.repository,
             workflow=self.workflow,
             test_suite=self.test_suite,
@@ -272,23 +348,23 @@ class CoverageReporter(BaseReporter):
                 else None
             ),
             job=llvm_cov_report.job_number,
-            line_count=totals.lines.count,
-            line_covered=totals.lines.covered,
-            line_not_covered=totals.lines.count - totals.lines.covered,
-            line_percent=totals.lines.percent,
-            function_count=totals.functions.count,
-            function_covered=totals.functions.covered,
-            function_not_covered=totals.functions.count - totals.functions.covered,
-            function_percent=totals.functions.percent,
-            branch_count=totals.branches.count,
-            branch_covered=totals.branches.covered,
-            branch_not_covered=totals.branches.count - totals.branches.covered,
-            branch_percent=totals.branches.percent,
+            line_count=lines.count,
+            line_covered=lines.covered,
+            line_not_covered=lines.count - lines.covered,
+            line_percent=lines.percent,
+            function_count=functions.count,
+            function_covered=functions.covered,
+            function_not_covered=functions.count - functions.covered,
+            function_percent=functions.percent,
+            branch_count=branches.count,
+            branch_covered=branches.covered,
+            branch_not_covered=branches.count - branches.covered,
+            branch_percent=branches.percent,
         )
 
     def _parse_pytest_report(self, pytest_report: PytestReport) -> CoverageReporterResult:
         totals: PytestTotals = pytest_report.totals
-        return CoverageReporterResult(
+        return CoverageReporterResult.model_construct(
             repository=self.repository,
             workflow=self.workflow,
             test_suite=self.test_suite,
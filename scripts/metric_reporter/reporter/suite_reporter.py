@@ -4,15 +4,16 @@
 
 """Module for reporting test suite results from CircleCI metadata."""
 
+import operator
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Sequence
+from typing import Any, Callable, Sequence
 
 from google.api_core.exceptions import GoogleAPIError
-from google.cloud.bigquery import ArrayQueryParameter, Client, QueryJobConfig, ScalarQueryParameter
-from pydantic import BaseModel
+from google.cloud.bigquery import Client, QueryJobConfig, ScalarQueryParameter
 
-from scripts.metric_reporter.constants import DATETIME_FORMAT
 from scripts.metric_reporter.parser.junit_xml_parser import (
     JestJUnitXmlTestSuites,
     JUnitXmlJobTestSuites,
@@ -26,6 +27,7 @@ from scripts.metric_reporter.reporter.base_reporter import (
     BaseReporter,
     ReporterError,
     ReporterResultBase,
+    parse_timestamp,
 )
 
 SUCCESS_RESULTS = {"success", "system-out"}
@@ -33,6 +35,33 @@ FAILURE_RESULT = "failure"
 SKIPPED_RESULT = "skipped"
 CANCELED_JOB_STATUS = "canceled"
 RUNNING_JOB_STATUS = "running"
+# Name of the Playwright test case property annotating a test as 'fixme'
+FIXME_PROPERTY = "fixme"
+# Name of the Playwright trace attachment linked in the system-out of a retried test case
+TRACE_ZIP = "trace.zip"
+
+# BigQuery column names of a suite result, in the order of the table schema
+SUITE_RESULT_FIELDNAMES: tuple[str, ...] = (
+    "Repository",
+    "Workflow",
+    "Test Suite",
+    "Date",
+    "Timestamp",
+    "Job Number",
+    "Status",
+    "Execution Time",
+    "Run Time",
+    "Success",
+    "Failure",
+    "Skipped",
+    "Fixme",
+    "Retry Count",
+    "Total",
+    "Success Rate",
+    "Failure Rate",
+    "Skipped Rate",
+    "Fixme Rate",
+)
 
 
 class Status(Enum):
@@ -42,8 +71,13 @@ class Status(Enum):
     FAILED = "failed"
 
 
+@dataclass(slots=True)
 class SuiteReporterResult(ReporterResultBase):
-    """Represents the results of a test suite run."""
+    """Represents the results of a test suite run.
+
+    A slotted dataclass rather than a pydantic model, since one is held per job for the whole
+    history of a test suite.
+    """
 
     repository: str
     workflow: str
@@ -80,6 +114,13 @@ class SuiteReporterResult(ReporterResultBase):
     # is re-executed more than once. Playwright only.
     retry: int = 0
 
+    # The parsed 'timestamp', used to order and filter results. Not a BigQuery column.
+    timestamp_dt: datetime = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Parse the timestamp once, when the result is created."""
+        self.timestamp_dt = parse_timestamp(self.timestamp)
+
     @property
     def total(self) -> int:
         """Calculate the total number of tests."""
@@ -124,31 +165,38 @@ class SuiteReporterResult(ReporterResultBase):
         Returns:
             dict[str, Any]: Dictionary representation of the test suite result.
         """
-        return {
-            "Repository": self.repository,
-            "Workflow": self.workflow,
-            "Test Suite": self.test_suite,
-            "Date": self.date,
-            "Timestamp": self.timestamp,
-            "Job Number": self.job,
-            "Status": self.status.value,
-            "Execution Time": self.execution_time,
-            "Run Time": self.run_time,
-            "Success": self.success,
-            "Failure": self.failure,
-            "Skipped": self.skipped,
-            "Fixme": self.fixme,
-            "Retry Count": self.retry,
-            "Total": self.total,
-            "Success Rate": self.success_rate,
-            "Failure Rate": self.failure_rate,
-            "Skipped Rate": self.skipped_rate,
-            "Fixme Rate": self.fixme_rate,
-        }
-
-
-class SuiteMetrics(BaseModel):
-    """Represents the results of a test suite."""
+        total: int = self.total
+        values: tuple[Any, ...] = (
+            self.repository,
+            self.workflow,
+            self.test_suite,
+            self.date,
+            self.timestamp,
+            self.job,
+            # Equivalent to 'self.status.value' without the property call and enum lookup
+            Status.FAILED.value if self.failure > 0 else Status.SUCCESS.value,
+            self.execution_time,
+            self.run_time,
+            self.success,
+            self.failure,
+            self.skipped,
+            self.fixme,
+            self.retry,
+            total,
+            self._calculate_rate(self.success, total),
+            self._calculate_rate(self.failure, total),
+            self._calculate_rate(self.skipped, total),
+            self._calculate_rate(self.fixme, total),
+        )
+        return dict(zip(SUITE_RESULT_FIELDNAMES, values, strict=True))
+
+
+@dataclass(slots=True)
+class SuiteMetrics:
+    """Represents the results of a test suite.
+
+    Only used to accumulate counts while parsing, so it is not validated.
+    """
 
     time: float | None = None
     tests: int = 0
@@ -166,12 +214,16 @@ class SuiteMetrics(BaseModel):
 class SuiteReporter(BaseReporter):
     """Handles the reporting of test suite results from CircleCI metadata and JUnit XML Reports."""
 
+    # Last update timestamps and job numbers, see BaseReporter._get_last_update
+    _last_update_cache: dict[str, dict[tuple[str, str], tuple[datetime, int]]] = {}
+
     def __init__(
         self,
         repository: str,
         workflow: str,
         test_suite: str,
         junit_artifact_list: list[JUnitXmlJobTestSuites] | None,
+        use_load_job: bool | None = None,
     ) -> None:
         """Initialize the reporter with the directory containing test result data.
 
@@ -181,11 +233,15 @@ class SuiteReporter(BaseReporter):
             test_suite (str): The test suite name.
             junit_artifact_list (list[JUnitXmlJobTestSuites] | None): The test results from JUnit
                                                                       XML artifacts.
+            use_load_job (bool | None): Whether to insert results with a load job (True) or
+                                        streaming inserts (False). By default, a load job is used
+                                        when the number of results reaches _LOAD_JOB_THRESHOLD.
         """
         super().__init__()
         self.repository = repository
         self.workflow = workflow
         self.test_suite = test_suite
+        self.use_load_job = use_load_job
         self.results: Sequence[SuiteReporterResult] = self._parse_results(junit_artifact_list)
 
     def update_table(self, client: Client, project_id: str, dataset_name: str) -> None:
@@ -205,19 +261,21 @@ class SuiteReporter(BaseReporter):
             )
             return
 
-        last_update: datetime | None = self._get_last_update(client, table_id)
+        last_update: tuple[datetime, int] | None = self._get_last_update(client, table_id)
 
         # If no 'last_update' insert all results, else insert results that occur after the last
-        # update timestamp
-        new_results: Sequence[SuiteReporterResult] = (
-            self.results
-            if not last_update
-            else [
-                r
-                for r in self.results
-                if r.timestamp and datetime.strptime(r.timestamp, DATETIME_FORMAT) > last_update
+        # update timestamp. Results are sorted by timestamp, so those are the trailing results,
+        # along with results sharing the last update timestamp from jobs after the last job.
+        new_results: Sequence[SuiteReporterResult] = self.results
+        if last_update:
+            last_timestamp, last_job = last_update
+            timestamp_key = operator.attrgetter("timestamp_dt")
+            start: int = bisect_left(self.results, last_timestamp, key=timestamp_key)
+            end: int = bisect_right(self.results, last_timestamp, key=timestamp_key)
+            new_results = [
+                *(result for result in self.results[start:end] if result.job > last_job),
+                *self.results[end:],
             ]
-        )
         if not new_results:
             self.logger.warning(
                 f"There are no new results for {self.repository}/{self.workflow}/{self.test_suite} "
@@ -225,148 +283,172 @@ class SuiteReporter(BaseReporter):
             )
             return
 
-        self._insert_rows(client, table_id, new_results)
+        self._insert_rows(client, table_id, new_results, initial_load=last_update is None)
 
-    def _check_rows_exist(
-        self, client: Client, table_id: str, results: Sequence[SuiteReporterResult]
-    ) -> bool:
-        query = f"""
-            SELECT 1
-            FROM `{table_id}`
-            WHERE `Job Number` IN UNNEST(@job_numbers)
-            LIMIT 1
-        """  # nosec
-        jobs: list[int] = [result.job for result in results]
-        query_parameters = [ArrayQueryParameter("job_numbers", "INT64", jobs)]
-        job_config = QueryJobConfig(query_parameters=query_parameters)
-        try:
-            query_job = client.query(query, job_config=job_config)
-            return any(query_job.result())
-        except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+        newest_job: int = max(result.job for result in new_results)
+        if last_update:
+            newest_job = max(newest_job, last_update[1])
+        self._advance_last_update(table_id, (new_results[-1].timestamp_dt, newest_job))
 
-    def _get_last_update(self, client: Client, table_id: str) -> datetime | None:
+    def _query_last_updates(
+        self, client: Client, table_id: str
+    ) -> dict[tuple[str, str], tuple[datetime, int]]:
         query = f"""
-            SELECT FORMAT_TIMESTAMP('{DATETIME_FORMAT}', MAX(`Timestamp`)) as last_update
+            SELECT
+                Workflow AS workflow,
+                `Test Suite` AS test_suite,
+                MAX(`Timestamp`) AS last_update,
+                MAX(`Job Number`) AS last_job
             FROM `{table_id}`
-            WHERE Repository = @repository AND Workflow = @workflow AND `Test Suite` = @test_suite
+            WHERE Repository = @repository
+            GROUP BY workflow, test_suite
         """  # nosec
-        query_parameters = [
-            ScalarQueryParameter("repository", "STRING", self.repository),
-            ScalarQueryParameter("workflow", "STRING", self.workflow),
-            ScalarQueryParameter("test_suite", "STRING", self.test_suite),
-        ]
+        query_parameters = [ScalarQueryParameter("repository", "STRING", self.repository)]
         job_config = QueryJobConfig(query_parameters=query_parameters)
         try:
             query_job = client.query(query, job_config=job_config)
-            result = query_job.result()
-            for row in result:
-                last_update: str | None = row["last_update"]
-                return datetime.strptime(last_update, DATETIME_FORMAT) if last_update else None
-        except (GoogleAPIError, TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                GoogleAPIError: f"Error executing query: {query}",
-                TypeError: f"The query, {query}, has an invalid format or type",
-                ValueError: f"The table name {table_id} is invalid",
+            return {
+                (row["workflow"], row["test_suite"]): (row["last_update"], row["last_job"])
+                for row in query_job.result()
+                if row["last_update"]
             }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
-        return None
+        except (GoogleAPIError, TypeError, ValueError) as error:
+            self._raise_reporter_error(
+                error, self._QUERY_ERROR_TEMPLATES, query=query, table_id=table_id
+            )
 
     def _insert_rows(
-        self, client: Client, table_id: str, results: Sequence[SuiteReporterResult]
+        self,
+        client: Client,
+        table_id: str,
+        results: Sequence[SuiteReporterResult],
+        initial_load: bool = False,
     ) -> None:
-        results_exist: bool = self._check_rows_exist(client, table_id, results)
-        if results_exist:
-            self.logger.warning(
-                f"Detected one or more results from "
-                f"{self.repository}/{self.workflow}/{self.test_suite} already exist in table "
-                f"{table_id}. Aborting insert."
-            )
+        # The initial load of a test suite is a backfill of its history, which is cheaper as a
+        # single load job, as are large batches. Streaming is kept for incremental updates.
+        use_load_job: bool = (
+            initial_load or len(results) >= self._LOAD_JOB_THRESHOLD
+            if self.use_load_job is None
+            else self.use_load_job
+        )
+        if use_load_job:
+            source = f"{self.repository}/{self.workflow}/{self.test_suite}"
+            self._load_rows(client, table_id, results, source)
             return
 
         try:
-            json_rows: list[dict[str, Any]] = [
-                results.dict_with_fieldnames() for results in results
-            ]
-            errors = client.insert_rows_json(table_id, json_rows)
-            if errors:
-                client_error_msg: str = (
-                    f"Failed to insert rows from "
-                    f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}: {errors}"
+            inserted: int = 0
+            for start in range(0, len(results), self._BATCH_SIZE):
+                chunk: Sequence[SuiteReporterResult] = results[start : start + self._BATCH_SIZE]
+                json_rows: list[dict[str, Any]] = [
+                    result.dict_with_fieldnames() for result in chunk
+                ]
+                errors = client.insert_rows_json(table_id, json_rows)
+                if errors:
+                    client_error_msg: str = (
+                        f"Failed to insert rows from "
+                        f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id} "
+                        f"after inserting {inserted} of {len(results)} results: {errors}"
+                    )
+                    self.logger.error(client_error_msg)
+                    raise ReporterError(client_error_msg)
+                inserted += len(chunk)
+                self.logger.debug(
+                    f"Inserted batch of {len(chunk)} results from "
+                    f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}."
                 )
-                self.logger.error(client_error_msg)
-                raise ReporterError(client_error_msg)
             self.logger.info(
-                f"Inserted {len(results)} results from "
+                f"Inserted {inserted} results from "
                 f"{self.repository}/{self.workflow}/{self.test_suite} into {table_id}."
             )
         except (TypeError, ValueError) as error:
-            error_mapping: dict[type, str] = {
-                TypeError: f"data is an improper format for insertion in {table_id}",
-                ValueError: f"The table name {table_id} is invalid",
-            }
-            error_msg: str = next(m for t, m in error_mapping.items() if isinstance(error, t))
-            self.logger.error(error_msg, exc_info=error)
-            raise ReporterError(error_msg) from error
+            self._raise_reporter_error(error, self._INSERT_ERROR_TEMPLATES, table_id=table_id)
 
     @staticmethod
-    def _extract_suite_metrics(suites) -> SuiteMetrics:
-        metrics = SuiteMetrics()
-        match suites:
-            case JestJUnitXmlTestSuites() | NextestJUnitXmlTestSuites():
-                metrics.time = suites.time
-                metrics.tests = suites.tests
-                metrics.failure = suites.failures
-                metrics.skipped = sum(suite.skipped for suite in suites.test_suites)
-            case MochaJUnitXmlTestSuites():
-                metrics.time = suites.time
-                # Mocha test reporting has been known to inaccurately total the number of
-                # tests at the top level, so we count the number of test cases
-                metrics.tests = (
-                    sum(len(suite.test_cases) for suite in suites.test_suites if suite.test_cases)
-                    if suites.test_suites
-                    else 0
-                )
-                metrics.failure = suites.failures
-                metrics.skipped = suites.skipped or 0
-            case PlaywrightJUnitXmlTestSuites():
-                metrics.time = suites.time
-                metrics.tests = suites.tests
-                metrics.failure = suites.failures
-                metrics.skipped = suites.skipped
-                metrics.fixme = sum(
-                    1
-                    for suite in suites.test_suites
-                    for case in suite.test_cases
-                    if case.properties and any(p.name == "fixme" for p in case.properties.property)
-                )
-                # An assumption is made that the presence of a nested system-out tag in
-                # a test case that contains a link to a trace.zip attachment file as
-                # content is the result of a retry.
-                metrics.retry = sum(
-                    1
-                    for suite in suites.test_suites
-                    for case in suite.test_cases
-                    if case.system_out and "trace.zip" in case.system_out
-                )
-            case PytestJUnitXmlTestSuites():
-                metrics.time = sum(suite.time for suite in suites.test_suites)
-                metrics.tests = sum(suite.tests for suite in suites.test_suites)
-                metrics.failure = sum(suite.failures for suite in suites.test_suites)
-                metrics.skipped = sum(suite.skipped for suite in suites.test_suites)
-            case TapJUnitXmlTestSuites():
-                metrics.tests = sum(suite.tests for suite in suites.test_suites)
-                metrics.failure = sum(suite.failures for suite in suites.test_suites)
-        return metrics
+    def _extract_jest_metrics(
+        suites: JestJUnitXmlTestSuites | NextestJUnitXmlTestSuites,
+    ) -> SuiteMetrics:
+        return SuiteMetrics(
+            time=suites.time,
+            tests=suites.tests,
+            failure=suites.failures,
+            skipped=sum(map(operator.attrgetter("skipped"), suites.test_suites)),
+        )
+
+    @staticmethod
+    def _extract_mocha_metrics(suites: MochaJUnitXmlTestSuites) -> SuiteMetrics:
+        return SuiteMetrics(
+            time=suites.time,
+            # Mocha test reporting has been known to inaccurately total the number of tests at the
+            # top level, so we count the number of test cases
+            tests=(
+                sum(len(suite.test_cases) for suite in suites.test_suites if suite.test_cases)
+                if suites.test_suites
+                else 0
+            ),
+            failure=suites.failures,
+            skipped=suites.skipped or 0,
+        )
+
+    @staticmethod
+    def _extract_playwright_metrics(suites: PlaywrightJUnitXmlTestSuites) -> SuiteMetrics:
+        # Test cases annotated 'fixme' and retried test cases are counted in a single pass
+        fixme = retry = 0
+        for suite in suites.test_suites:
+            for case in suite.test_cases:
+                if case.properties:
+                    for test_property in case.properties.property:
+                        if test_property.name == FIXME_PROPERTY:
+                            fixme += 1
+                            break
+                # An assumption is made that the presence of a nested system-out tag in a test
+                # case that contains a link to a trace.zip attachment file as content is the
+                # result of a retry.
+                if case.system_out and TRACE_ZIP in case.system_out:
+                    retry += 1
+        return SuiteMetrics(
+            time=suites.time,
+            tests=suites.tests,
+            failure=suites.failures,
+            skipped=suites.skipped,
+            fixme=fixme,
+            retry=retry,
+        )
+
+    @staticmethod
+    def _extract_pytest_metrics(suites: PytestJUnitXmlTestSuites) -> SuiteMetrics:
+        # The totals are summed in a single pass over the suites
+        time: float = 0
+        tests = failure = skipped = 0
+        for suite in suites.test_suites:
+            time += suite.time
+            tests += suite.tests
+            failure += suite.failures
+            skipped += suite.skipped
+        return SuiteMetrics(time=time, tests=tests, failure=failure, skipped=skipped)
+
+    @staticmethod
+    def _extract_tap_metrics(suites: TapJUnitXmlTestSuites) -> SuiteMetrics:
+        return SuiteMetrics(
+            tests=sum(map(operator.attrgetter("tests"), suites.test_suites)),
+            failure=sum(map(operator.attrgetter("failures"), suites.test_suites)),
+        )
+
+    # Metrics extractors by test suites type, so that each test suites object is dispatched with a
+    # single lookup rather than matching it against every type in turn
+    _SUITE_METRICS_EXTRACTORS: dict[type, Callable[[Any], SuiteMetrics]] = {
+        JestJUnitXmlTestSuites: _extract_jest_metrics,
+        NextestJUnitXmlTestSuites: _extract_jest_metrics,
+        MochaJUnitXmlTestSuites: _extract_mocha_metrics,
+        PlaywrightJUnitXmlTestSuites: _extract_playwright_metrics,
+        PytestJUnitXmlTestSuites: _extract_pytest_metrics,
+        TapJUnitXmlTestSuites: _extract_tap_metrics,
+    }
+
+    @classmethod
+    def _extract_suite_metrics(cls, suites) -> SuiteMetrics:
+        extractor = cls._SUITE_METRICS_EXTRACTORS.get(type(suites))
+        return extractor(suites) if extractor else SuiteMetrics()
 
     def _parse_results(
         self, artifacts_list: list[JUnitXmlJobTestSuites] | None
@@ -375,36 +457,45 @@ class SuiteReporter(BaseReporter):
         if not artifacts_list:
             return results
 
+        extract_suite_metrics = self._extract_suite_metrics
         for artifact in artifacts_list:
-            test_suite_result = SuiteReporterResult(
-                repository=self.repository,
-                workflow=self.workflow,
-                test_suite=self.test_suite,
-                timestamp=artifact.job_timestamp,
-                date=self._extract_date(artifact.job_timestamp),
-                job=artifact.job,
-            )
-
-            times: list[float] = []
+            # Metrics are accumulated in locals and assigned once the artifact has been processed
+            failure = skipped = success = fixme = retry = 0
+            run_time: float = 0
+            execution_time: float = 0
             for suites in artifact.test_suites:
-                suite_metrics: SuiteMetrics = self._extract_suite_metrics(suites)
+                suite_metrics: SuiteMetrics = extract_suite_metrics(suites)
                 if suite_metrics.time:
-                    times.append(suite_metrics.time)
-                test_suite_result.failure += suite_metrics.failure
-                test_suite_result.skipped += suite_metrics.skipped
-                test_suite_result.success += suite_metrics.success
-                test_suite_result.fixme += suite_metrics.fixme
-                test_suite_result.retry += suite_metrics.retry
+                    run_time += suite_metrics.time
+                    execution_time = max(execution_time, suite_metrics.time)
+                failure += suite_metrics.failure
+                skipped += suite_metrics.skipped
+                success += suite_metrics.success
+                fixme += suite_metrics.fixme
+                retry += suite_metrics.retry
 
             # Times are not always available, for example with TAP.
             # Times at the suites, suite and case level may not sum-up to the same values. This can
             # be due to many factors including the use of threads.
-            test_suite_result.run_time = sum(times)
-            test_suite_result.execution_time = max(times) if times else 0
-
-            results.append(test_suite_result)
+            results.append(
+                SuiteReporterResult(
+                    repository=self.repository,
+                    workflow=self.workflow,
+                    test_suite=self.test_suite,
+                    timestamp=artifact.job_timestamp,
+                    date=self._extract_date(artifact.job_timestamp),
+                    job=artifact.job,
+                    run_time=run_time,
+                    execution_time=execution_time,
+                    success=success,
+                    failure=failure,
+                    skipped=skipped,
+                    fixme=fixme,
+                    retry=retry,
+                )
+            )
 
         # Sort by timestamp and then by job
-        sorted_results = sorted(results, key=lambda result: (result.timestamp, result.job))
+        results.sort(key=operator.attrgetter("timestamp_dt", "job"))
 
-        return sorted_results
+        return results
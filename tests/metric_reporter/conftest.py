@@ -4,11 +4,13 @@
 
 """Module for test configurations for the Metric Reporter."""
 
+from datetime import date
 from pathlib import Path
 from typing import Any
 
 import pytest
 from pydantic import BaseModel
+from pytest_mock import MockerFixture
 
 from scripts.metric_reporter.parser.coverage_json_parser import (
     PytestReport,
@@ -34,8 +36,9 @@ from scripts.metric_reporter.parser.junit_xml_parser import (
     PytestJUnitXmlTestSuites,
     PlaywrightJUnitXmlProperties,
 )
+from scripts.metric_reporter.reporter.averages_reporter import AveragesReporter
 from scripts.metric_reporter.reporter.coverage_reporter import CoverageReporterResult
-from scripts.metric_reporter.reporter.suite_reporter import SuiteReporterResult
+from scripts.metric_reporter.reporter.suite_reporter import SuiteReporter, SuiteReporterResult
 
 JUNIT_XML_JOB_TEST_SUITES_LIST: list[JUnitXmlJobTestSuites] | None = [
     JUnitXmlJobTestSuites(
@@ -600,3 +603,41 @@ def results_artifact_data(test_data_directory: Path) -> SampleResultsData:
         report_results=ARTIFACT_RESULTS,
         json_rows=ARTIFACT_JSON,
     )
+
+
+@pytest.fixture
+def clear_last_update_cache(mocker: MockerFixture) -> None:
+    """Isolate a test from the last updates cached by reporters in other tests.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    for reporter_class in (AveragesReporter, SuiteReporter):
+        mocker.patch.object(reporter_class, "_last_update_cache", {})
+
+
+def last_update_rows(
+    config: ConfigValues,
+    last_update: date,
+    last_job: int | None = None,
+    test_suite: str | None = None,
+) -> list[dict[str, Any]]:
+    """Build the rows returned by a last update query for a test suite.
+
+    Args:
+        config (ConfigValues): Common config values.
+        last_update (date): The last update of the test suite, a date or a datetime.
+        last_job (int | None): The last job number of the test suite, for tables tracking it.
+        test_suite (str | None): The test suite name. Defaults to the configured test suite.
+
+    Returns:
+        list[dict[str, Any]]: The last update query rows.
+    """
+    row: dict[str, Any] = {
+        "workflow": config.workflow,
+        "test_suite": test_suite or config.test_suite,
+        "last_update": last_update,
+    }
+    if last_job is not None:
+        row["last_job"] = last_job
+    return [row]
@@ -9,6 +9,7 @@ from datetime import date
 from pathlib import Path
 from typing import Sequence
 
+import pytest
 from pytest import LogCaptureFixture
 from pytest_mock import MockerFixture
 
@@ -17,7 +18,10 @@ from scripts.metric_reporter.reporter.averages_reporter import (
     AveragesReporterResult,
 )
 from scripts.metric_reporter.reporter.suite_reporter import SuiteReporterResult
-from tests.metric_reporter.conftest import ConfigValues
+from tests.metric_reporter.conftest import ConfigValues, last_update_rows
+
+pytestmark = pytest.mark.usefixtures("clear_last_update_cache")
+
 
 SUITE_RESULTS: Sequence[SuiteReporterResult] = [
     SuiteReporterResult(
@@ -370,7 +374,7 @@ def test_averages_reporter_update_table_with_new_results(
         config (ConfigValues): pytest fixture for common config values.
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": date(2024, 4, 29)}]
+    get_last_update_query_mock.result.return_value = last_update_rows(config, date(2024, 4, 29))
     check_rows_exist_query_mock = mocker.MagicMock()
     check_rows_exist_query_mock.result.return_value = []
     client_mock = mocker.MagicMock()
@@ -385,7 +389,10 @@ def test_averages_reporter_update_table_with_new_results(
 
     reporter.update_table(client_mock, config.project_id, config.dataset_name)
 
-    client_mock.insert_rows_json.assert_called_once_with(expected_table_id, EXPECTED_JSON)
+    client_mock.insert_rows_json.assert_called_once()
+    table_id, json_rows = client_mock.insert_rows_json.call_args.args
+    assert table_id == expected_table_id
+    assert list(json_rows) == EXPECTED_JSON
 
 
 def test_averages_reporter_update_table_with_new_results_and_row_duplication(
@@ -400,7 +407,7 @@ def test_averages_reporter_update_table_with_new_results_and_row_duplication(
         config (ConfigValues): pytest fixture for common config values.
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": date(2024, 1, 1)}]
+    get_last_update_query_mock.result.return_value = last_update_rows(config, date(2024, 1, 1))
     check_rows_exist_query_mock = mocker.MagicMock()
     check_rows_exist_query_mock.result.return_value = [{"1": 1}]
     client_mock = mocker.MagicMock()
@@ -421,6 +428,12 @@ def test_averages_reporter_update_table_with_new_results_and_row_duplication(
 
         assert expected_log in caplog.text
 
+    # Nothing was inserted, so the cached last update is left as queried
+    table_id = f"{config.project_id}.{config.dataset_name}.{config.repository}_averages"
+    assert AveragesReporter._last_update_cache[table_id] == {
+        (config.workflow, config.test_suite): date(2024, 1, 1)
+    }
+
 
 def test_averages_reporter_update_table_without_new_results(
     caplog: LogCaptureFixture, mocker: MockerFixture, config: ConfigValues
@@ -433,7 +446,7 @@ def test_averages_reporter_update_table_without_new_results(
         config (ConfigValues): pytest fixture for common config values.
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": date(2024, 5, 1)}]
+    get_last_update_query_mock.result.return_value = last_update_rows(config, date(2024, 5, 1))
     mock_client = mocker.MagicMock()
     mock_client.query.return_value = get_last_update_query_mock
 
@@ -0,0 +1,192 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""Tests for the BaseReporter module."""
+
+import re
+from datetime import datetime, timezone
+
+import pytest
+from google.api_core.exceptions import GoogleAPIError
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud.bigquery import Client
+from google.oauth2 import service_account
+from pytest_mock import MockerFixture
+
+from scripts.metric_reporter.reporter.averages_reporter import AveragesReporter
+from scripts.metric_reporter.reporter.base_reporter import (
+    BaseReporter,
+    ReporterError,
+    parse_timestamp,
+)
+from scripts.metric_reporter.reporter.suite_reporter import SuiteReporter
+
+
+def test_base_reporter_get_client(mocker: MockerFixture) -> None:
+    """Test BaseReporter get_client creates a single client shared by all reporters.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    mocker.patch.object(BaseReporter, "_clients", {})
+    mocker.patch("scripts.metric_reporter.reporter.base_reporter.AuthorizedSession")
+    client_class_mock = mocker.patch("scripts.metric_reporter.reporter.base_reporter.Client")
+    credentials_mock = mocker.MagicMock()
+
+    client = BaseReporter.get_client(credentials_mock, "project")
+
+    assert SuiteReporter.get_client(credentials_mock, "project") is client
+    client_class_mock.assert_called_once()
+
+
+def test_base_reporter_get_client_per_project(mocker: MockerFixture) -> None:
+    """Test BaseReporter get_client creates a separate client for each project.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    mocker.patch.object(BaseReporter, "_clients", {})
+    mocker.patch("scripts.metric_reporter.reporter.base_reporter.AuthorizedSession")
+    client_class_mock = mocker.patch("scripts.metric_reporter.reporter.base_reporter.Client")
+    client_class_mock.side_effect = lambda **kwargs: mocker.MagicMock(project=kwargs["project"])
+    credentials_mock = mocker.MagicMock()
+
+    client = BaseReporter.get_client(credentials_mock, "project")
+    other_client = BaseReporter.get_client(credentials_mock, "other_project")
+
+    assert client is not other_client
+    assert client.project == "project"
+    assert other_client.project == "other_project"
+
+
+def test_base_reporter_get_client_scopes_session_credentials(mocker: MockerFixture) -> None:
+    """Test BaseReporter get_client authorizes the pooled session with the BigQuery scope.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    mocker.patch.object(BaseReporter, "_clients", {})
+    client_class_mock = mocker.patch("scripts.metric_reporter.reporter.base_reporter.Client")
+    client_class_mock.SCOPE = Client.SCOPE
+    credentials = service_account.Credentials(  # type: ignore
+        signer=mocker.MagicMock(),
+        service_account_email="reporter@project.iam.gserviceaccount.com",
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+
+    BaseReporter.get_client(credentials, "project")
+
+    session: AuthorizedSession = client_class_mock.call_args.kwargs["_http"]
+    assert tuple(session.credentials.scopes) == Client.SCOPE
+    assert not session.credentials.requires_scopes
+
+
+def test_base_reporter_last_update_cache_per_reporter_type() -> None:
+    """Test BaseReporter last updates are cached separately for each type of reporter."""
+    assert SuiteReporter._last_update_cache is not AveragesReporter._last_update_cache
+
+
+def test_base_reporter_update_tables_parallel(mocker: MockerFixture) -> None:
+    """Test BaseReporter update_tables_parallel updates the table of every reporter.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    client_mock = mocker.MagicMock()
+    reporters = [mocker.MagicMock(spec=BaseReporter) for _ in range(3)]
+
+    BaseReporter.update_tables_parallel(reporters, client_mock, "project", "dataset")
+
+    for reporter in reporters:
+        reporter.update_table.assert_called_once_with(client_mock, "project", "dataset")
+
+
+def test_base_reporter_update_tables_parallel_with_failures(mocker: MockerFixture) -> None:
+    """Test BaseReporter update_tables_parallel attempts every update before raising failures.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+    """
+    client_mock = mocker.MagicMock()
+    reporters = [mocker.MagicMock(spec=BaseReporter) for _ in range(3)]
+    reporters[0].update_table.side_effect = ReporterError("first failure")
+    reporters[2].update_table.side_effect = ReporterError("second failure")
+
+    with pytest.raises(ReporterError, match="2 of 3 table updates failed"):
+        BaseReporter.update_tables_parallel(reporters, client_mock, "project", "dataset")
+
+    for reporter in reporters:
+        reporter.update_table.assert_called_once_with(client_mock, "project", "dataset")
+
+
+@pytest.mark.parametrize(
+    "error, expected_error_msg",
+    [
+        (GoogleAPIError("failed"), "Error executing query: SELECT 1"),
+        (TypeError("invalid"), "The query, SELECT 1, has an invalid format or type"),
+        (ValueError("invalid"), "The table name project.dataset.table is invalid"),
+    ],
+    ids=["google_api_error", "type_error", "value_error"],
+)
+def test_base_reporter_raise_reporter_error(error: Exception, expected_error_msg: str) -> None:
+    """Test BaseReporter _raise_reporter_error raises a ReporterError from the mapped template.
+
+    Args:
+        error (Exception): The error raised by the BigQuery call.
+        expected_error_msg (str): The expected ReporterError message.
+    """
+    with pytest.raises(ReporterError, match=re.escape(expected_error_msg)) as error_info:
+        BaseReporter._raise_reporter_error(
+            error,
+            BaseReporter._QUERY_ERROR_TEMPLATES,
+            query="SELECT 1",
+            table_id="project.dataset.table",
+        )
+
+    assert error_info.value.__cause__ is error
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2024-01-02T03:04:05Z",
+        "2024-01-02T03:04:05",
+        "2024-01-02T04:04:05+01:00",
+        "Tue, 02 Jan 2024 03:04:05 GMT",
+    ],
+    ids=["utc_suffix", "no_offset", "offset", "rfc_2822"],
+)
+def test_parse_timestamp(timestamp: str) -> None:
+    """Test parse_timestamp returns the UTC datetime of ISO 8601 and other timestamps.
+
+    Args:
+        timestamp (str): The timestamp to parse.
+    """
+    assert parse_timestamp(timestamp) == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp_with_invalid_timestamp() -> None:
+    """Test parse_timestamp raises a ReporterError for an invalid timestamp."""
+    with pytest.raises(ReporterError, match="Invalid timestamp format: invalid"):
+        parse_timestamp("invalid")
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    ["2024-01-02T03:04:05Z", "2024-01-02T03:04:05+01:00", "Tue, 02 Jan 2024 03:04:05 GMT"],
+    ids=["iso_utc", "iso_offset", "rfc_2822"],
+)
+def test_base_reporter_extract_date(timestamp: str) -> None:
+    """Test BaseReporter _extract_date returns the date of ISO 8601 and other timestamps.
+
+    Args:
+        timestamp (str): The timestamp to extract the date from.
+    """
+    assert BaseReporter._extract_date(timestamp) == "2024-01-02"
+
+
+def test_base_reporter_extract_date_with_invalid_timestamp() -> None:
+    """Test BaseReporter _extract_date raises a ReporterError for an invalid timestamp."""
+    with pytest.raises(ReporterError, match="Invalid timestamp format: invalid"):
+        BaseReporter._extract_date("invalid")
@@ -4,7 +4,9 @@
 
 """Tests for the CoverageReporter module."""
 
+import json
 import logging
+from datetime import datetime, timezone
 from typing import Any
 
 import pytest
@@ -46,9 +48,9 @@ def test_coverage_reporter_init(
     "fixture, last_update_return_value",
     [
         ("coverage_llvm_cov_data", []),
-        ("coverage_llvm_cov_data", [{"last_update": "2024-01-01T00:00:00Z"}]),
+        ("coverage_llvm_cov_data", [{"last_update": datetime(2024, 1, 1, tzinfo=timezone.utc)}]),
         ("coverage_pytest_data", []),
-        ("coverage_pytest_data", [{"last_update": "2024-01-01T00:00:00Z"}]),
+        ("coverage_pytest_data", [{"last_update": datetime(2024, 1, 1, tzinfo=timezone.utc)}]),
     ],
     ids=[
         "llvm-cov_new_table",
@@ -62,7 +64,7 @@ def test_coverage_reporter_update_table_with_new_results(
     config: ConfigValues,
     fixture: str,
     request: pytest.FixtureRequest,
-    last_update_return_value: list[dict[str, str]],
+    last_update_return_value: list[dict[str, datetime]],
 ) -> None:
     """Test CoverageReporter update_table method with new coverage results.
 
@@ -71,7 +73,7 @@ def test_coverage_reporter_update_table_with_new_results(
         config (ConfigValues): pytest fixture for common config values.
         fixture (str): The name of the fixture with coverage sample data.
         request (FixtureRequest): A pytest request object for accessing fixtures.
-        last_update_return_value (list[dict[str, str]]): Value returned by get_last_update mock.
+        last_update_return_value (list[dict[str, datetime]]): Value returned by get_last_update mock.
     """
     coverage_data: SampleCoverageData = request.getfixturevalue(fixture)
 
@@ -80,7 +82,13 @@ def test_coverage_reporter_update_table_with_new_results(
     check_rows_exist_query_mock = mocker.MagicMock()
     check_rows_exist_query_mock.result.return_value = []
     client_mock = mocker.MagicMock()
-    client_mock.query.side_effect = [get_last_update_query_mock, check_rows_exist_query_mock]
+    # Without a recent update, the last update is queried again over the full table and existing
+    # rows are checked for, otherwise the last update alone filters the results
+    client_mock.query.side_effect = (
+        [get_last_update_query_mock]
+        if last_update_return_value
+        else [get_last_update_query_mock, get_last_update_query_mock, check_rows_exist_query_mock]
+    )
     client_mock.insert_rows_json.return_value = []
 
     expected_table_id = f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage"
@@ -118,16 +126,21 @@ def test_coverage_reporter_update_table_with_new_results_and_row_duplication(
     coverage_data: SampleCoverageData = request.getfixturevalue(fixture)
 
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": "2024-01-01T00:00:00Z"}]
+    get_last_update_query_mock.result.return_value = []
     check_rows_exist_query_mock = mocker.MagicMock()
     check_rows_exist_query_mock.result.return_value = [{"1": 1}]
     client_mock = mocker.MagicMock()
-    client_mock.query.side_effect = [get_last_update_query_mock, check_rows_exist_query_mock]
+    client_mock.query.side_effect = [
+        get_last_update_query_mock,
+        get_last_update_query_mock,
+        check_rows_exist_query_mock,
+    ]
 
     expected_log = (
         f"Detected one or more results from "
         f"{config.repository}/{config.workflow}/{config.test_suite} already exist in table "
-        f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage. Aborting insert."
+        f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage. Skipping their "
+        f"insert."
     )
 
     reporter = CoverageReporter(
@@ -162,7 +175,9 @@ def test_coverage_reporter_update_table_without_new_results(
     coverage_data: SampleCoverageData = request.getfixturevalue(fixture)
 
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": "2024-09-01T00:00:00Z"}]
+    get_last_update_query_mock.result.return_value = [
+        {"last_update": datetime(2024, 9, 1, tzinfo=timezone.utc)}
+    ]
     mock_client = mocker.MagicMock()
     mock_client.query.return_value = get_last_update_query_mock
 
@@ -197,7 +212,7 @@ def test_coverage_reporter_update_table_with_empty_test_results(
 
     expected_log = (
         f"There are no results for {config.repository}/{config.workflow}/{config.test_suite} "
-        f"to add to {config.project_id}.{config.dataset_name}.{config.repository}_coverage."
+        f"to add to BigQuery."
     )
 
     reporter = CoverageReporter(
@@ -209,3 +224,152 @@ def test_coverage_reporter_update_table_with_empty_test_results(
 
         assert client_mock.mock_calls == [], "Expected no interactions with the mock client."
         assert expected_log in caplog.text
+
+
+def test_coverage_reporter_get_last_update_from_older_partitions(
+    mocker: MockerFixture, config: ConfigValues
+) -> None:
+    """Test CoverageReporter _get_last_update only queries older partitions without a recent one.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+    """
+    last_update = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    no_recent_update_query_mock = mocker.MagicMock()
+    no_recent_update_query_mock.result.return_value = [{"last_update": None}]
+    older_update_query_mock = mocker.MagicMock()
+    older_update_query_mock.result.return_value = [{"last_update": last_update}]
+    client_mock = mocker.MagicMock()
+    client_mock.query.side_effect = [no_recent_update_query_mock, older_update_query_mock]
+    table_id = f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage"
+
+    reporter = CoverageReporter(config.repository, config.workflow, config.test_suite, [])
+
+    assert reporter._get_last_update(client_mock, table_id) == last_update
+    recent_query, older_query = [call.args[0] for call in client_mock.query.call_args_list]
+    assert "DATE(`Timestamp`) >=" in recent_query
+    assert "DATE(`Timestamp`) <" in older_query
+
+
+@pytest.mark.parametrize(
+    "llvm_cov_rows_exist", [False, True], ids=["new_table", "existing_llvm_cov_rows"]
+)
+def test_coverage_reporter_flush_all(
+    caplog: LogCaptureFixture,
+    mocker: MockerFixture,
+    config: ConfigValues,
+    coverage_llvm_cov_data: SampleCoverageData,
+    coverage_pytest_data: SampleCoverageData,
+    llvm_cov_rows_exist: bool,
+) -> None:
+    """Test CoverageReporter flush_all combines results sharing a table into a single insert,
+       leaving out only the results of test suites that already exist in the table.
+
+    Args:
+        caplog (LogCaptureFixture): pytest fixture for capturing log output.
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        coverage_llvm_cov_data (SampleCoverageData): llvm-cov coverage sample data.
+        coverage_pytest_data (SampleCoverageData): pytest coverage sample data.
+        llvm_cov_rows_exist (bool): Whether the llvm-cov results already exist in the table,
+                                    without a timestamp.
+    """
+    no_last_update_query_mock = mocker.MagicMock()
+    no_last_update_query_mock.result.return_value = []
+    last_update_query_mock = mocker.MagicMock()
+    last_update_query_mock.result.return_value = [
+        {"last_update": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    ]
+    rows_exist_query_mock = mocker.MagicMock()
+    rows_exist_query_mock.result.return_value = [{"1": 1}]
+    no_rows_exist_query_mock = mocker.MagicMock()
+    no_rows_exist_query_mock.result.return_value = []
+    client_mock = mocker.MagicMock()
+    # Without a recent update, the last update is queried again over the full table and existing
+    # rows are checked for
+    llvm_cov_queries = [no_last_update_query_mock, no_last_update_query_mock]
+    if llvm_cov_rows_exist:
+        # The pytest suite has new results after its last update
+        queries = [*llvm_cov_queries, rows_exist_query_mock, last_update_query_mock]
+        expected_results: list[dict[str, Any]] = coverage_pytest_data.json_rows
+    else:
+        queries = [
+            *llvm_cov_queries,
+            no_rows_exist_query_mock,
+            no_last_update_query_mock,
+            no_last_update_query_mock,
+            no_rows_exist_query_mock,
+        ]
+        expected_results = [
+            *({**row, "Test Suite": "llvm_cov"} for row in coverage_llvm_cov_data.json_rows),
+            *coverage_pytest_data.json_rows,
+        ]
+    client_mock.query.side_effect = queries
+    client_mock.insert_rows_json.return_value = []
+
+    expected_table_id = f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage"
+
+    reporters = [
+        CoverageReporter(config.repository, config.workflow, test_suite, coverage_data.report_list)
+        for test_suite, coverage_data in (
+            ("llvm_cov", coverage_llvm_cov_data),
+            (config.test_suite, coverage_pytest_data),
+        )
+    ]
+
+    with caplog.at_level(logging.WARNING):
+        CoverageReporter.flush_all(reporters, client_mock, config.project_id, config.dataset_name)
+
+    assert client_mock.query.call_count == len(queries)
+    client_mock.insert_rows_json.assert_called_once_with(expected_table_id, expected_results)
+    assert (
+        f"Detected one or more results from {config.repository}/{config.workflow}/llvm_cov "
+        f"already exist" in caplog.text
+    ) is llvm_cov_rows_exist
+
+
+@pytest.mark.parametrize(
+    "fixture", ["coverage_llvm_cov_data", "coverage_pytest_data"], ids=["llvm-cov", "pytest"]
+)
+def test_coverage_reporter_update_table_with_load_job(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    fixture: str,
+    request: pytest.FixtureRequest,
+) -> None:
+    """Test CoverageReporter update_table method uses a load job for large insertions.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        fixture (str): The name of the fixture with coverage sample data.
+        request (FixtureRequest): A pytest request object for accessing fixtures.
+    """
+    coverage_data: SampleCoverageData = request.getfixturevalue(fixture)
+    mocker.patch.object(CoverageReporter, "_LOAD_JOB_THRESHOLD", 1)
+
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = []
+    check_rows_exist_query_mock = mocker.MagicMock()
+    check_rows_exist_query_mock.result.return_value = []
+    client_mock = mocker.MagicMock()
+    client_mock.query.side_effect = [
+        get_last_update_query_mock,
+        get_last_update_query_mock,
+        check_rows_exist_query_mock,
+    ]
+
+    expected_table_id = f"{config.project_id}.{config.dataset_name}.{config.repository}_coverage"
+
+    reporter = CoverageReporter(
+        config.repository, config.workflow, config.test_suite, coverage_data.report_list
+    )
+
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    client_mock.insert_rows_json.assert_not_called()
+    client_mock.load_table_from_file.assert_called_once()
+    ndjson, table_id = client_mock.load_table_from_file.call_args.args
+    assert table_id == expected_table_id
+    assert [json.loads(line) for line in ndjson.getvalue().splitlines()] == coverage_data.json_rows
@@ -4,7 +4,9 @@
 
 """Tests for the SuiteReporter module."""
 
+import json
 import logging
+from datetime import datetime, timezone
 
 import pytest
 from pytest import LogCaptureFixture
@@ -12,7 +14,9 @@ from pytest_mock import MockerFixture
 
 from scripts.metric_reporter.parser.junit_xml_parser import JUnitXmlJobTestSuites
 from scripts.metric_reporter.reporter.suite_reporter import SuiteReporter
-from tests.metric_reporter.conftest import ConfigValues, SampleResultsData
+from tests.metric_reporter.conftest import ConfigValues, SampleResultsData, last_update_rows
+
+pytestmark = pytest.mark.usefixtures("clear_last_update_cache")
 
 
 def test_suite_reporter_init(
@@ -31,16 +35,10 @@ def test_suite_reporter_init(
     assert reporter.results == results_artifact_data.report_results
 
 
-@pytest.mark.parametrize(
-    "last_update_return_value",
-    [[], [{"last_update": "2023-01-01T00:00:00Z"}]],
-    ids=["new_table", "existing_table"],
-)
 def test_suite_reporter_update_table_with_new_results(
     mocker: MockerFixture,
     config: ConfigValues,
     results_artifact_data: SampleResultsData,
-    last_update_return_value: list[dict[str, str]],
 ) -> None:
     """Test SuiteReporter update_table method with new test results.
 
@@ -48,14 +46,13 @@ def test_suite_reporter_update_table_with_new_results(
         mocker (MockerFixture): pytest_mock fixture for mocking.
         config (ConfigValues): pytest fixture for common config values.
         results_artifact_data (SampleResultsData): results artifact data.
-        last_update_return_value (list[dict[str, str]]): Value returned by get_last_update mock
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = last_update_return_value
-    check_rows_exist_query_mock = mocker.MagicMock()
-    check_rows_exist_query_mock.result.return_value = []
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, datetime.fromisoformat("2023-01-01T00:00:00Z"), last_job=0
+    )
     client_mock = mocker.MagicMock()
-    client_mock.query.side_effect = [get_last_update_query_mock, check_rows_exist_query_mock]
+    client_mock.query.return_value = get_last_update_query_mock
     client_mock.insert_rows_json.return_value = []
 
     expected_table_id = (
@@ -68,37 +65,273 @@ def test_suite_reporter_update_table_with_new_results(
 
     reporter.update_table(client_mock, config.project_id, config.dataset_name)
 
-    client_mock.insert_rows_json.assert_called_once_with(
-        expected_table_id, results_artifact_data.json_rows
+    client_mock.query.assert_called_once()
+    client_mock.insert_rows_json.assert_called_once()
+    table_id, json_rows = client_mock.insert_rows_json.call_args.args
+    assert table_id == expected_table_id
+    assert list(json_rows) == results_artifact_data.json_rows
+
+
+def test_suite_reporter_update_table_with_partially_new_results(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+) -> None:
+    """Test SuiteReporter update_table method only inserts results after the last update.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): results artifact data.
+    """
+    last_result = results_artifact_data.report_results[2]
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, last_result.timestamp_dt, last_job=last_result.job
+    )
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+    client_mock.insert_rows_json.return_value = []
+
+    expected_table_id = (
+        f"{config.project_id}.{config.dataset_name}.{config.repository}_suite_results"
+    )
+    expected_json_rows = results_artifact_data.json_rows[3:]
+
+    reporter = SuiteReporter(
+        config.repository, config.workflow, config.test_suite, results_artifact_data.artifact_list
     )
 
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    assert expected_json_rows
+    client_mock.insert_rows_json.assert_called_once()
+    table_id, json_rows = client_mock.insert_rows_json.call_args.args
+    assert table_id == expected_table_id
+    assert list(json_rows) == expected_json_rows
+
 
-def test_suite_reporter_update_table_with_new_results_and_row_duplication(
+def test_suite_reporter_update_table_in_batches(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+) -> None:
+    """Test SuiteReporter update_table method splits the insert into batches.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): results artifact data.
+    """
+    mocker.patch.object(SuiteReporter, "_BATCH_SIZE", 1)
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, datetime.fromisoformat("2023-01-01T00:00:00Z"), last_job=0
+    )
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+    client_mock.insert_rows_json.return_value = []
+
+    expected_table_id = (
+        f"{config.project_id}.{config.dataset_name}.{config.repository}_suite_results"
+    )
+
+    reporter = SuiteReporter(
+        config.repository, config.workflow, config.test_suite, results_artifact_data.artifact_list
+    )
+
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    inserted_rows = [
+        (call.args[0], list(call.args[1])) for call in client_mock.insert_rows_json.call_args_list
+    ]
+    assert inserted_rows == [
+        (expected_table_id, [json_row]) for json_row in results_artifact_data.json_rows
+    ]
+
+
+@pytest.mark.parametrize(
+    "last_update", [None, "2023-01-01T00:00:00Z"], ids=["new_table", "large_batch"]
+)
+def test_suite_reporter_update_table_with_load_job(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+    last_update: str | None,
+) -> None:
+    """Test SuiteReporter update_table method uses a load job for initial and large insertions.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): results artifact data.
+        last_update (str | None): The last update timestamp of the test suite in the table.
+    """
+    if last_update:
+        mocker.patch.object(SuiteReporter, "_LOAD_JOB_THRESHOLD", 1)
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = (
+        last_update_rows(config, datetime.fromisoformat(last_update), last_job=0)
+        if last_update
+        else []
+    )
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+
+    expected_table_id = (
+        f"{config.project_id}.{config.dataset_name}.{config.repository}_suite_results"
+    )
+
+    reporter = SuiteReporter(
+        config.repository, config.workflow, config.test_suite, results_artifact_data.artifact_list
+    )
+
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    client_mock.insert_rows_json.assert_not_called()
+    client_mock.load_table_from_file.assert_called_once()
+    ndjson, table_id = client_mock.load_table_from_file.call_args.args
+    assert table_id == expected_table_id
+    assert [
+        json.loads(line) for line in ndjson.getvalue().splitlines()
+    ] == results_artifact_data.json_rows
+
+
+@pytest.mark.parametrize("use_load_job", [True, False], ids=["load_job", "streaming"])
+def test_suite_reporter_update_table_with_forced_insert_mode(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+    use_load_job: bool,
+) -> None:
+    """Test SuiteReporter update_table method uses the insert mode forced by the constructor.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): results artifact data.
+        use_load_job (bool): Whether the reporter is forced to use a load job.
+    """
+    mocker.patch.object(SuiteReporter, "_LOAD_JOB_THRESHOLD", 1 if not use_load_job else 1000)
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, datetime.fromisoformat("2023-01-01T00:00:00Z"), last_job=0
+    )
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+    client_mock.insert_rows_json.return_value = []
+
+    reporter = SuiteReporter(
+        config.repository,
+        config.workflow,
+        config.test_suite,
+        results_artifact_data.artifact_list,
+        use_load_job=use_load_job,
+    )
+
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    assert client_mock.load_table_from_file.called == use_load_job
+    assert client_mock.insert_rows_json.called != use_load_job
+
+
+def test_suite_reporter_update_table_with_results_sharing_last_update(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+) -> None:
+    """Test SuiteReporter update_table method inserts results sharing the last update timestamp
+       from jobs after the last job.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): artifact data.
+    """
+    tied_result = results_artifact_data.report_results[1]
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, tied_result.timestamp_dt, last_job=tied_result.job - 1
+    )
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+    client_mock.insert_rows_json.return_value = []
+
+    reporter = SuiteReporter(
+        config.repository, config.workflow, config.test_suite, results_artifact_data.artifact_list
+    )
+
+    reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    client_mock.query.assert_called_once()
+    client_mock.insert_rows_json.assert_called_once()
+    assert (
+        list(client_mock.insert_rows_json.call_args.args[1])
+        == (results_artifact_data.json_rows[1:])
+    )
+
+
+def test_suite_reporter_update_table_with_shared_last_update_cache(
+    mocker: MockerFixture,
+    config: ConfigValues,
+    results_artifact_data: SampleResultsData,
+) -> None:
+    """Test SuiteReporter update_table method queries the last updates once per table.
+
+    Args:
+        mocker (MockerFixture): pytest_mock fixture for mocking.
+        config (ConfigValues): pytest fixture for common config values.
+        results_artifact_data (SampleResultsData): results artifact data.
+    """
+    get_last_update_query_mock = mocker.MagicMock()
+    get_last_update_query_mock.result.return_value = [
+        *last_update_rows(config, datetime(2024, 1, 6, tzinfo=timezone.utc), last_job=0),
+        *last_update_rows(
+            config, datetime(2024, 1, 7, tzinfo=timezone.utc), last_job=0, test_suite="other_suite"
+        ),
+    ]
+    client_mock = mocker.MagicMock()
+    client_mock.query.return_value = get_last_update_query_mock
+
+    reporters = [
+        SuiteReporter(
+            config.repository, config.workflow, test_suite, results_artifact_data.artifact_list
+        )
+        for test_suite in [config.test_suite, "other_suite"]
+    ]
+
+    for reporter in reporters:
+        reporter.update_table(client_mock, config.project_id, config.dataset_name)
+
+    client_mock.query.assert_called_once()
+    client_mock.insert_rows_json.assert_not_called()
+
+
+def test_suite_reporter_update_table_advances_last_update_cache(
     caplog: LogCaptureFixture,
     mocker: MockerFixture,
     config: ConfigValues,
     results_artifact_data: SampleResultsData,
 ) -> None:
-    """Test SuiteReporter update_table method with new test results, but a duplicate is found before
-       insertion.
+    """Test SuiteReporter update_table method advances the cached last update after inserting.
 
     Args:
         caplog (LogCaptureFixture): pytest fixture for capturing log output.
         mocker (MockerFixture): pytest_mock fixture for mocking.
         config (ConfigValues): pytest fixture for common config values.
-        results_artifact_data (SampleResultsData): artifact data.
+        results_artifact_data (SampleResultsData): results artifact data.
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": "2024-01-01T00:00:00Z"}]
-    check_rows_exist_query_mock = mocker.MagicMock()
-    check_rows_exist_query_mock.result.return_value = [{"1": 1}]
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, datetime.fromisoformat("2023-01-01T00:00:00Z"), last_job=0
+    )
     client_mock = mocker.MagicMock()
-    client_mock.query.side_effect = [get_last_update_query_mock, check_rows_exist_query_mock]
+    client_mock.query.return_value = get_last_update_query_mock
+    client_mock.insert_rows_json.return_value = []
 
     expected_log = (
-        f"Detected one or more results from "
-        f"{config.repository}/{config.workflow}/{config.test_suite} already exist in table "
-        f"{config.project_id}.{config.dataset_name}.{config.repository}_suite_results. Aborting insert."
+        f"There are no new results for {config.repository}/{config.workflow}/{config.test_suite} "
+        f"to add to {config.project_id}.{config.dataset_name}.{config.repository}_suite_results."
     )
 
     reporter = SuiteReporter(
@@ -107,8 +340,11 @@ def test_suite_reporter_update_table_with_new_results_and_row_duplication(
 
     with caplog.at_level(logging.WARNING):
         reporter.update_table(client_mock, config.project_id, config.dataset_name)
+        reporter.update_table(client_mock, config.project_id, config.dataset_name)
 
         assert expected_log in caplog.text
+    client_mock.query.assert_called_once()
+    client_mock.insert_rows_json.assert_called_once()
 
 
 def test_suite_reporter_update_table_without_new_test_results(
@@ -126,7 +362,9 @@ def test_suite_reporter_update_table_without_new_test_results(
         results_artifact_data (SampleResultsData): artifact data.
     """
     get_last_update_query_mock = mocker.MagicMock()
-    get_last_update_query_mock.result.return_value = [{"last_update": "2024-01-06T00:00:00Z"}]
+    get_last_update_query_mock.result.return_value = last_update_rows(
+        config, datetime.fromisoformat("2024-01-06T00:00:00Z"), last_job=0
+    )
     mock_client = mocker.MagicMock()
     mock_client.query.return_value = get_last_update_query_mock
 